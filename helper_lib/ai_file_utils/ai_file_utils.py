@@ -1,5 +1,6 @@
 import base64
 import copy
+import functools
 import html
 import json
 import urllib.parse
@@ -22,14 +23,26 @@ class AIFileUtils:
         self._actions_schema = None
         self._actions_config_path = Path(__file__).parent / "ai_file_actions.json"
 
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def _read_schema(path_str: str) -> Dict[str, Any]:
+        """
+        Read and parse a schema file, cached per path.
+
+        The schema ships with the package and doesn't change within a build,
+        so instances created for the same path share one parsed dict; action
+        definitions are deep-copied before resolution, keeping the shared
+        schema unmutated.
+        """
+        return json.loads(Path(path_str).read_text(encoding="utf-8"))
+
     def _load_actions_schema(self):
         """
         Loads the actions definition from the JSON file.
         """
         try:
             if self._actions_config_path.exists():
-                text = self._actions_config_path.read_text(encoding="utf-8")
-                self._actions_schema = json.loads(text)
+                self._actions_schema = self._read_schema(str(self._actions_config_path))
                 log.info(
                     f"[ai_file_utils] Loaded actions schema from {self._actions_config_path}"
                 )
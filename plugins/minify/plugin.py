@@ -102,6 +102,12 @@ class MinifyPlugin(BasePlugin):
         self._href_scan_any_link_bases: set[str] = set()
         self._href_scan_stylesheet_bases: set[str] = set()
 
+    def _reset_href_scan_cache(self) -> None:
+        """Clear the cached href scan so the next check re-reads the site HTML."""
+        self._href_scan_site_dir = None
+        self._href_scan_any_link_bases = set()
+        self._href_scan_stylesheet_bases = set()
+
     def _tpl_replaced_in_post_template(self, base: str) -> bool:
         """Return True if on_post_template already replaced at least one link for this basename."""
         for _tpl, by_base in (self._tpl_rewrite_replaced or {}).items():
@@ -1,4 +1,6 @@
+import functools
 import hashlib
+import io
 import ipaddress
 import json
 import os
@@ -6,12 +8,21 @@ import re
 import shutil
 import socket
 import subprocess
+import sys
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from urllib import error as urllib_error
 from urllib import request as urllib_request
 from urllib.parse import urlparse
 
+try:  # optional accelerator for large JSON outputs
+    import orjson
+except ImportError:
+    orjson = None
+
 import yaml
 from mkdocs.config.config_options import Type
 from mkdocs.plugins import BasePlugin
@@ -22,18 +33,63 @@ from mkdocs.utils import log
 
 FM_PATTERN = re.compile(r"^---\s*\n(.*?)\n---\s*\n?", re.DOTALL)
 PLACEHOLDER_PATTERN = re.compile(r"{{\s*([A-Za-z0-9_.-]+)\s*}}")
+# Combined pass: a placeholder to resolve or an HTML comment to drop
+PLACEHOLDER_OR_COMMENT_PATTERN = re.compile(
+    r"{{\s*(?P<var>[A-Za-z0-9_.-]+)\s*}}|(?P<cmt><!--.*?-->)", re.DOTALL
+)
 SNIPPET_TOKEN_REGEX = re.compile(r"-{1,}8<-{2,}\s*['\"]([^'\"]+)['\"]")
 SNIPPET_LINE_REGEX = re.compile(
     r"(?m)^(?P<indent>[ \t]*)-{1,}8<-{2,}\s*['\"](?P<ref>[^'\"]+)['\"]\s*$"
 )
 HEADING_RE = re.compile(r"^(#{2,6})\s+(.+?)\s*#*\s*$")
+WHITESPACE_RE = re.compile(r"\s+")
+FENCE_RE = re.compile(r"^(\s*)(`{3,}|~{3,})")
+ORDERED_LIST_RE = re.compile(r"^\d+\.\s")
 SNIPPET_SECTION_REGEX = re.compile(
     r"""^\s*(?:#|//|;|<!--)?\s*--8<--\s*\[(?P<kind>start|end):(?P<name>[^\]]+)\]\s*(?:-->)*\s*$""",
     re.IGNORECASE,
 )
+# Document-level variant of SNIPPET_SECTION_REGEX: consumes whole marker
+# lines (including their newline) in a single multiline sub
+SNIPPET_SECTION_LINE_RE = re.compile(
+    r"^[ \t]*(?:#|//|;|<!--)?[ \t]*--8<--[ \t]*\[(?:start|end):[^\]]+\][ \t]*(?:-->)*[ \t]*\r?\n?",
+    re.IGNORECASE | re.MULTILINE,
+)
 SNIPPET_DOUBLE_RANGE_RE = re.compile(r"^(?P<path>.+?)::(?P<end>-?\d+)$")
 SNIPPET_RANGE_RE = re.compile(r"^(?P<path>.+?):(?P<start>-?\d+):(?P<end>-?\d+)$")
 SNIPPET_SINGLE_RANGE_RE = re.compile(r"^(?P<path>.+?):(?P<start>-?\d+)$")
+WORD_RE = re.compile(r"\b\w+\b", re.UNICODE)
+TOKEN_RE = re.compile(r"\w+|[^\s\w]", re.UNICODE)
+# Chunk size for incremental SHA-256 updates on large bodies
+_HASH_CHUNK_SIZE = 1 << 20
+# Inputs above this size skip the LRU cache: site-wide concatenations and
+# bundle bodies change on every edit under mkdocs serve and would pin a
+# full-site copy in the cache per rebuild.
+_HASH_CACHE_MAX_LEN = 1 << 18
+
+
+def _sha256_text(content: str | bytes) -> str:
+    # Feed the hasher incrementally via a memoryview so the temporary
+    # encoded copy can be released chunk by chunk; OpenSSL releases the
+    # GIL for updates >=2048 bytes, so large bodies hash concurrently.
+    # Callers that already hold UTF-8 bytes can pass them directly and
+    # skip the encode.
+    h = hashlib.sha256()
+    encoded = content if isinstance(content, bytes) else content.encode("utf-8")
+    if len(encoded) <= _HASH_CHUNK_SIZE:
+        h.update(encoded)
+    else:
+        view = memoryview(encoded)
+        for i in range(0, len(view), _HASH_CHUNK_SIZE):
+            h.update(view[i : i + _HASH_CHUNK_SIZE])
+    return "sha256:" + h.hexdigest()
+
+
+@functools.lru_cache(maxsize=4096)
+def _sha256_text_cached(content: str | bytes) -> str:
+    # Identical page bodies (mkdocs serve rebuilds, shared snippets) are
+    # hashed once per process.
+    return _sha256_text(content)
 
 
 # Define plugin class
@@ -47,6 +103,11 @@ class ResolveMDPlugin(BasePlugin):
         self.allowed_domains = []
         self.docs_base_url = "/"
         self._remote_snippet_cache: dict[str, str | None] = {}
+        self._remote_snippet_lock = threading.Lock()
+        self._variables_source: dict | None = None
+        self._variables_flat: dict[str, str] = {}
+        # slug -> (scan key, scan result); one entry per live page
+        self._scan_cache: dict[str, tuple] = {}
 
     # Process will start after site build is complete
     def on_post_build(self, config):
@@ -70,6 +131,7 @@ class ResolveMDPlugin(BasePlugin):
         # Load shared variables (variables.yml sits inside docs_dir)
         variables_path = docs_dir / "variables.yml"
         variables = self.load_yaml(str(variables_path))
+        self._flat_variables_for(variables)
         if not variables:
             log.warning(f"[resolve_md] no variables loaded from {variables_path}")
 
@@ -119,18 +181,27 @@ class ResolveMDPlugin(BasePlugin):
         else:
             git_timestamps = {}
 
-        processed = 0
+        # Warm the remote snippet cache up front so per-page expansion below
+        # never blocks on the network
+        self.prefetch_remote_snippets(markdown_files, variables)
 
-        ai_pages: list[dict] = []
+        # Pages overwhelmingly share a small vocabulary of category lists;
+        # keep one list object per distinct combination
+        category_list_cache: dict[tuple[str, ...], list[str]] = {}
 
-        # For each file in markdown_files
-        for md_path in markdown_files:
-            text = Path(md_path).read_text(encoding="utf-8")
+        # Process one markdown file; returns the ai_pages entry for it.
+        # Each file is independent (read, regex work, write) and the hot
+        # paths release the GIL, so the files are mapped onto a thread pool.
+        def _process_one(md_path: str) -> dict:
+            text = Path(md_path).read_bytes().decode("utf-8")
             # Separate, filter, map, and return desired front matter
             front_matter, body = self.split_front_matter(text)
             reduced_fm = self.map_front_matter(front_matter)
             categories = self.normalize_categories(reduced_fm.get("categories"))
             if categories:
+                categories = category_list_cache.setdefault(
+                    tuple(categories), categories
+                )
                 reduced_fm["categories"] = categories
             elif "categories" in reduced_fm:
                 reduced_fm.pop("categories")
@@ -141,14 +212,12 @@ class ResolveMDPlugin(BasePlugin):
             if snippet_body != body:
                 log.debug(f"[resolve_md] resolved snippets in {md_path}")
             body = snippet_body
-            # Resolve variable placeholders against variables.yml definitions
-            resolved_body = self.resolve_markdown_placeholders(body, variables)
-            if resolved_body != body:
-                log.debug(f"[resolve_md] resolved placeholders in {md_path}")
-            # Remove HTML comments after substitutions
-            cleaned_body = self.remove_html_comments(resolved_body)
-            if cleaned_body != resolved_body:
-                log.debug(f"[resolve_md] stripped HTML comments in {md_path}")
+            # Resolve variable placeholders and strip HTML comments in one pass
+            cleaned_body = self.resolve_placeholders_and_strip_comments(
+                body, variables
+            )
+            if cleaned_body != body:
+                log.debug(f"[resolve_md] resolved placeholders/comments in {md_path}")
             # Convert path to slug and canonical URLs
             rel_path = Path(md_path).relative_to(docs_dir)
             rel_no_ext = str(rel_path.with_suffix(""))
@@ -161,8 +230,9 @@ class ResolveMDPlugin(BasePlugin):
             if not last_updated:
                 last_updated = self.get_git_last_updated(md_path, has_git)
 
-            # Output resolved Markdown file to AI artifacts directory
-            header = dict(reduced_fm)
+            # Output resolved Markdown file to AI artifacts directory;
+            # reduced_fm is not reused elsewhere, so extend it in place
+            header = reduced_fm
             header["url"] = url
             header["word_count"] = word_count
             header["token_estimate"] = token_estimate
@@ -172,34 +242,28 @@ class ResolveMDPlugin(BasePlugin):
             if route.endswith("/index"):
                 route = route[: -len("/index")]
             self.write_ai_page(site_dir / (route + ".md"), header, cleaned_body)
-            processed += 1
-            # Creates list used later for category file creation
-            cats = reduced_fm.get("categories") or []
-            if isinstance(cats, str):
-                cats_value = [cats]
-            else:
-                cats_value = cats
-
-            ai_pages.append(
-                {
-                    "slug": slug,
-                    "path": Path(md_path),
-                    "title": header.get("title") or slug,
-                    "description": header.get("description") or "",
-                    "categories": cats_value,
-                    "url": url,
-                    "word_count": word_count,
-                    "token_estimate": token_estimate,
-                    "version_hash": version_hash,
-                    "last_updated": last_updated,
-                    "body": cleaned_body,
-                }
-            )
-
             log.debug(f"[resolve_md] {md_path} FM keys: {list(front_matter.keys())}")
             log.debug(f"[resolve_md] {md_path} mapped FM: {reduced_fm}")
 
-        log.info(f"[resolve_md] processed {processed} AI pages")
+            return {
+                "slug": slug,
+                "path": Path(md_path),
+                "title": header.get("title") or slug,
+                "description": header.get("description") or "",
+                "categories": categories,
+                "url": url,
+                "md_url": url.rstrip("/") + ".md",
+                "word_count": word_count,
+                "token_estimate": token_estimate,
+                "version_hash": version_hash,
+                "last_updated": last_updated,
+                "body": cleaned_body,
+            }
+
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            ai_pages = list(executor.map(_process_one, markdown_files))
+
+        log.info(f"[resolve_md] processed {len(ai_pages)} AI pages")
         if ai_pages:
             log.debug(
                 f"[resolve_md] sample AI page metadata: slug={ai_pages[0]['slug']} cats={ai_pages[0].get('categories')}"
@@ -434,7 +498,9 @@ class ResolveMDPlugin(BasePlugin):
         for item in candidates:
             text = str(item).strip()
             if text:
-                result.append(text)
+                # Categories recur across many pages; intern so each
+                # distinct name is stored (and hashed) once
+                result.append(sys.intern(text))
         return result
 
     # Resolve variables and placeholders
@@ -453,16 +519,77 @@ class ResolveMDPlugin(BasePlugin):
         return value
 
     @staticmethod
-    def resolve_markdown_placeholders(content: str, variables: dict) -> str:
+    def flatten_variables(variables: dict) -> dict[str, str]:
+        """Flatten nested variables into one {dotted.path: str(value)} lookup.
+
+        Every reachable node is pre-stringified so placeholder resolution
+        becomes a single dict hit instead of an O(depth) walk per match.
+        """
+        flat: dict[str, str] = {}
+
+        def walk(prefix: str, node: dict) -> None:
+            for key, value in node.items():
+                dotted = f"{prefix}.{key}" if prefix else str(key)
+                if value is not None:
+                    flat[dotted] = str(value)
+                if isinstance(value, dict):
+                    walk(dotted, value)
+
+        if isinstance(variables, dict):
+            walk("", variables)
+        return flat
+
+    def _flat_variables_for(self, variables: dict) -> dict[str, str]:
+        """Return the flattened lookup for *variables*, rebuilding on change."""
+        if variables is not self._variables_source:
+            self._variables_source = variables
+            self._variables_flat = self.flatten_variables(variables)
+        return self._variables_flat
+
+    def resolve_markdown_placeholders(self, content: str, variables: dict) -> str:
         """Replace {{ dotted.keys }} using variables dict; leave unknowns intact."""
+        if "{{" not in content:
+            return content
+        flat = self._flat_variables_for(variables)
 
         def replacer(match):
             key_path = match.group(1)
-            value = ResolveMDPlugin.get_value_from_path(variables, key_path)
-            return str(value) if value is not None else match.group(0)
+            value = flat.get(key_path)
+            if value is None:
+                raw = self.get_value_from_path(variables, key_path)
+                return str(raw) if raw is not None else match.group(0)
+            return value
 
         return PLACEHOLDER_PATTERN.sub(replacer, content)
 
+    def resolve_placeholders_and_strip_comments(self, content: str, variables: dict) -> str:
+        """Resolve {{ dotted.keys }} and drop <!-- ... --> comments in one body pass.
+
+        Equivalent to resolve_markdown_placeholders followed by
+        remove_html_comments, but walks the body once and joins the pieces
+        at the end instead of building two intermediate copies.
+        """
+        if "{{" not in content and "<!--" not in content:
+            return content
+        flat = self._flat_variables_for(variables)
+        parts: list[str] = []
+        last_end = 0
+        for m in PLACEHOLDER_OR_COMMENT_PATTERN.finditer(content):
+            parts.append(content[last_end : m.start()])
+            key_path = m.group("var")
+            if key_path is not None:
+                value = flat.get(key_path)
+                if value is None:
+                    raw = self.get_value_from_path(variables, key_path)
+                    value = str(raw) if raw is not None else m.group(0)
+                parts.append(value)
+            # comments contribute nothing to the output
+            last_end = m.end()
+        if not parts:
+            return content
+        parts.append(content[last_end:])
+        return "".join(parts)
+
     # Replace snippet placeholders with code blocks
 
     @staticmethod
@@ -672,6 +799,11 @@ class ResolveMDPlugin(BasePlugin):
 
         return None
 
+    def _cache_remote_snippet(self, url: str, value: str | None) -> None:
+        """Record a fetch result (None marks a failed fetch) under the cache lock."""
+        with self._remote_snippet_lock:
+            self._remote_snippet_cache[url] = value
+
     def fetch_remote_snippet(self, snippet_ref: str) -> str:
         """Retrieve remote snippet via HTTP unless remote fetching is disabled."""
         if not self.allow_remote_snippets:
@@ -688,8 +820,11 @@ class ResolveMDPlugin(BasePlugin):
             )
             return f"<!-- BLOCKED REMOTE SNIPPET {snippet_ref} -->"
 
-        if url in self._remote_snippet_cache:
-            snippet_content = self._remote_snippet_cache[url]
+        with self._remote_snippet_lock:
+            cached = url in self._remote_snippet_cache
+            if cached:
+                snippet_content = self._remote_snippet_cache[url]
+        if cached:
             if snippet_content is None:
                 return f"<!-- ERROR FETCHING REMOTE SNIPPET {snippet_ref} -->"
         else:
@@ -701,22 +836,22 @@ class ResolveMDPlugin(BasePlugin):
                         log.warning(
                             f"[resolve_md] remote snippet too large ({content_length} bytes): {snippet_ref}"
                         )
-                        self._remote_snippet_cache[url] = None
+                        self._cache_remote_snippet(url, None)
                         return f"<!-- REMOTE SNIPPET TOO LARGE {snippet_ref} -->"
                     raw = response.read(_MAX_SNIPPET_BYTES + 1)
                     if len(raw) > _MAX_SNIPPET_BYTES:
                         log.warning(
                             f"[resolve_md] remote snippet exceeded {_MAX_SNIPPET_BYTES} bytes: {snippet_ref}"
                         )
-                        self._remote_snippet_cache[url] = None
+                        self._cache_remote_snippet(url, None)
                         return f"<!-- REMOTE SNIPPET TOO LARGE {snippet_ref} -->"
                     snippet_content = raw.decode("utf-8")
-                self._remote_snippet_cache[url] = snippet_content
+                self._cache_remote_snippet(url, snippet_content)
             except (urllib_error.URLError, urllib_error.HTTPError) as exc:
                 log.warning(
                     f"[resolve_md] error fetching remote snippet {snippet_ref}: {exc}"
                 )
-                self._remote_snippet_cache[url] = None
+                self._cache_remote_snippet(url, None)
                 return f"<!-- ERROR FETCHING REMOTE SNIPPET {snippet_ref} -->"
 
         snippet_content = self.apply_snippet_selectors(
@@ -727,6 +862,44 @@ class ResolveMDPlugin(BasePlugin):
         snippet_content = snippet_content.strip()
         return self.strip_snippet_section_markers(snippet_content)
 
+    def prefetch_remote_snippets(
+        self, markdown_files: list[str], variables: dict
+    ) -> None:
+        """Warm the remote snippet cache by fetching unique URLs concurrently.
+
+        Scans the raw markdown sources for --8<-- references, resolves any
+        {{variables}} in them, and fetches each distinct http(s) URL on a
+        small thread pool so page processing later hits only the cache.
+        Sequential fetches pay one round-trip per reference; this pays
+        roughly the slowest single fetch.
+        """
+        if not self.allow_remote_snippets:
+            return
+        urls: set[str] = set()
+        for md_path in markdown_files:
+            try:
+                text = Path(md_path).read_bytes().decode("utf-8")
+            except OSError:
+                continue
+            if "8<" not in text:
+                continue
+            refs = SNIPPET_LINE_REGEX.findall(text)
+            for _indent, ref in refs:
+                urls.add(ref)
+            urls.update(SNIPPET_TOKEN_REGEX.findall(text))
+        remote_urls = set()
+        for ref in urls:
+            resolved = self.resolve_markdown_placeholders(ref, variables)
+            if resolved.startswith("http"):
+                url, _start, _end, _section = self.parse_line_range(resolved)
+                remote_urls.add(url)
+        if not remote_urls:
+            return
+        log.info(f"[resolve_md] prefetching {len(remote_urls)} remote snippet(s)")
+        with ThreadPoolExecutor(max_workers=min(16, len(remote_urls))) as executor:
+            # fetch_remote_snippet populates _remote_snippet_cache as it goes
+            list(executor.map(self.fetch_remote_snippet, remote_urls))
+
     def replace_snippet_placeholders(
         self, markdown: str, snippet_directory: Path, variables: dict
     ) -> str:
@@ -757,6 +930,10 @@ class ResolveMDPlugin(BasePlugin):
             snippet_ref = match.group(1)
             return fetch_snippet(snippet_ref)
 
+        # Cheap substring probe ("-8<--" at minimum) before any regex work
+        if "8<" not in markdown:
+            return markdown
+
         max_depth = 100
         previous = None
         iterations = 0
@@ -779,32 +956,46 @@ class ResolveMDPlugin(BasePlugin):
     @staticmethod
     def remove_html_comments(content: str) -> str:
         """Remove <!-- ... --> comments (multiline)."""
+        if "<!--" not in content:
+            return content
         return re.sub(r"<!--.*?-->", "", content, flags=re.DOTALL)
 
     @staticmethod
     def strip_snippet_section_markers(content: str) -> str:
         """Remove snippet section markers (# --8<-- [start:end]) from snippet content."""
-        lines = content.splitlines()
-        cleaned = [ln for ln in lines if not SNIPPET_SECTION_REGEX.match(ln.strip())]
-        return "\n".join(cleaned)
+        cleaned = SNIPPET_SECTION_LINE_RE.sub("", content)
+        # Match the old splitlines/join behavior: normalized line endings
+        # and no trailing newline
+        if "\r" in cleaned:
+            cleaned = cleaned.replace("\r\n", "\n").replace("\r", "\n")
+        return cleaned.removesuffix("\n")
 
     # Word count & token estimation
 
     @staticmethod
     def word_count(content: str) -> int:
-        return len(re.findall(r"\b\w+\b", content, flags=re.UNICODE))
+        # finditer avoids materializing a list of every match just to len() it
+        return sum(1 for _ in WORD_RE.finditer(content))
 
     @staticmethod
     def estimate_tokens(content: str) -> int:
-        return len(re.findall(r"\w+|[^\s\w]", content, flags=re.UNICODE))
+        return sum(1 for _ in TOKEN_RE.finditer(content))
 
     @staticmethod
-    def sha256_text(content: str) -> str:
-        return "sha256:" + hashlib.sha256(content.encode("utf-8")).hexdigest()
-
-    def extract_outline_and_sections(
-        self, body: str, max_depth: int = 3
-    ) -> tuple[list[dict], list[dict]]:
+    def sha256_text(content: str | bytes) -> str:
+        if len(content) > _HASH_CACHE_MAX_LEN:
+            return _sha256_text(content)
+        return _sha256_text_cached(content)
+
+    def _scan_body(
+        self, body: str, max_depth: int = 3, preview_chars: int = 500
+    ) -> tuple[list[dict], list[dict], str]:
+        """Single pass over *body* producing outline, sections, and preview.
+
+        The heading scanner and the preview scanner previously walked the
+        body independently, each tracking its own code-fence state; this
+        fuses them into one line loop sharing that state.
+        """
         lines = body.splitlines(keepends=True)
         in_code = False
         fence = None
@@ -817,19 +1008,42 @@ class ResolveMDPlugin(BasePlugin):
         sections_meta: list[tuple[int, int, str, str]] = []
         anchors_seen: dict[str, int] = {}
 
+        para: list[str] = []
+        preview_done = False
+
+        def bad_start(s: str) -> bool:
+            s = s.lstrip()
+            return (
+                not s
+                or s.startswith("#")
+                or s.startswith(">")
+                or s.startswith("- ")
+                or s.startswith("* ")
+                or ORDERED_LIST_RE.match(s) is not None
+            )
+
         for idx, line in enumerate(lines):
-            m_fence = re.match(r"^(\s*)(`{3,}|~{3,})", line)
+            m_fence = FENCE_RE.match(line)
             if m_fence:
                 token = m_fence.group(2)
                 if not in_code:
                     in_code, fence = True, token
                 elif token == fence:
                     in_code, fence = False, None
+                if para:
+                    preview_done = True
                 continue
 
             if in_code:
                 continue
 
+            if not preview_done:
+                if line.strip() == "":
+                    if para:
+                        preview_done = True
+                elif para or not bad_start(line):
+                    para.append(line)
+
             m = HEADING_RE.match(line)
             if not m:
                 continue
@@ -857,48 +1071,29 @@ class ResolveMDPlugin(BasePlugin):
                     "start_char": start_char,
                     "end_char": next_start,
                     "text": section_text,
+                    # Counted here so downstream consumers don't re-walk the
+                    # section text just to size it.
+                    "token_count": self.estimate_tokens(section_text),
                 }
             )
 
-        return outline, sections
-
-    def extract_preview(self, body: str, max_chars: int = 500) -> str:
-        lines = body.splitlines()
-        in_code = False
-        para: list[str] = []
-
-        def bad_start(s: str) -> bool:
-            s = s.lstrip()
-            return (
-                not s
-                or s.startswith("#")
-                or s.startswith(">")
-                or s.startswith("- ")
-                or s.startswith("* ")
-                or re.match(r"^\d+\.\s", s) is not None
-            )
+        if para:
+            preview = WHITESPACE_RE.sub(" ", " ".join(para)).strip()
+            preview = preview[:preview_chars].rstrip()
+        else:
+            preview = ""
 
-        def finish(buf: list[str]) -> str:
-            text = " ".join(" ".join(buf).split())
-            return text[:max_chars].rstrip()
+        return outline, sections, preview
 
-        for line in lines:
-            if re.match(r"^(\s*)(`{3,}|~{3,})", line):
-                in_code = not in_code
-                if para:
-                    break
-                continue
-            if in_code:
-                continue
-            if line.strip() == "":
-                if para:
-                    break
-                continue
-            if not para and bad_start(line):
-                continue
-            para.append(line)
+    def extract_outline_and_sections(
+        self, body: str, max_depth: int = 3
+    ) -> tuple[list[dict], list[dict]]:
+        outline, sections, _preview = self._scan_body(body, max_depth=max_depth)
+        return outline, sections
 
-        return finish(para) if para else ""
+    def extract_preview(self, body: str, max_chars: int = 500) -> str:
+        _outline, _sections, preview = self._scan_body(body, preview_chars=max_chars)
+        return preview
 
     # Convert file path to slug, create markdown file URL
 
@@ -950,12 +1145,9 @@ class ResolveMDPlugin(BasePlugin):
 
     def reset_directory(self, output_dir: Path) -> None:
         """Remove existing artifacts before writing fresh files."""
+        if output_dir.exists():
+            shutil.rmtree(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
-        for entry in output_dir.iterdir():
-            if entry.is_dir():
-                shutil.rmtree(entry)
-            else:
-                entry.unlink()
 
     def write_ai_page(self, out_path: Path, header: dict, body: str):
         """Write resolved markdown with YAML front matter."""
@@ -978,9 +1170,10 @@ class ResolveMDPlugin(BasePlugin):
         fm_yaml = yaml.safe_dump(
             fm_obj, sort_keys=False, allow_unicode=True, width=4096
         ).strip()
-        content = f"---\n{fm_yaml}\n---\n\n{body.strip()}\n"
-        with out_path.open("w", encoding="utf-8") as fh:
-            fh.write(content)
+        # Single os.write of pre-encoded bytes; skips text-mode translation
+        out_path.write_bytes(
+            ("---\n" + fm_yaml + "\n---\n\n" + body.strip() + "\n").encode("utf-8")
+        )
         log.debug(f"[resolve_md] wrote {out_path}")
 
     # Category and slug helper functions
@@ -1024,16 +1217,12 @@ class ResolveMDPlugin(BasePlugin):
 
     @staticmethod
     def union_pages(sets: list[list[dict]]) -> list[dict]:
-        seen = set()
-        out: list[dict] = []
+        # Dedup by slug through one insertion-ordered dict pass
+        merged: dict[str, dict] = {}
         for lst in sets:
             for p in lst:
-                slug = p.get("slug")
-                if slug in seen:
-                    continue
-                seen.add(slug)
-                out.append(p)
-        return out
+                merged.setdefault(p.get("slug"), p)
+        return list(merged.values())
 
     def write_category_bundle(
         self,
@@ -1060,45 +1249,49 @@ class ResolveMDPlugin(BasePlugin):
         if build_timestamp:
             fm_obj["build_timestamp"] = build_timestamp
 
-        # Build body content first so we can hash it for the front matter
-        body_lines: list[str] = []
-        body_lines.append(f"# Begin New Bundle: {category}")
+        # Stream body content into one buffer so we can hash it for the
+        # front matter without accumulating a list of line fragments
+        body_buf = io.StringIO()
+        body_buf.write(f"# Begin New Bundle: {category}")
         if includes_base and base_categories:
-            body_lines.append(
-                f"Includes shared base categories: {', '.join(base_categories)}"
+            body_buf.write(
+                f"\nIncludes shared base categories: {', '.join(base_categories)}"
             )
-        body_lines.append("")
+        body_buf.write("\n")
 
         for page in pages:
-            body_lines.append("\n---\n")
+            body_buf.write("\n\n---\n")
             title = page.get("title") or page["slug"]
-            body_lines.append(f"Page Title: {title}\n")
-            resolved_url = page.get("url", "").rstrip("/") + ".md"
-            body_lines.append(f"- Resolved Markdown: {resolved_url}")
+            body_buf.write(f"\nPage Title: {title}\n")
+            resolved_url = page.get("md_url") or page.get("url", "").rstrip("/") + ".md"
+            body_buf.write(f"\n- Resolved Markdown: {resolved_url}")
             html_url = page.get("url")
             if html_url:
-                body_lines.append(f"- Canonical (HTML): {html_url}")
+                body_buf.write(f"\n- Canonical (HTML): {html_url}")
             description = page.get("description")
             if description:
-                body_lines.append(f"- Summary: {description}")
-            body_lines.append(
-                f"- Word Count: {page.get('word_count', 0)}; Token Estimate: {page.get('token_estimate', 0)}"
+                body_buf.write(f"\n- Summary: {description}")
+            body_buf.write(
+                f"\n- Word Count: {page.get('word_count', 0)}; Token Estimate: {page.get('token_estimate', 0)}"
             )
-            body_lines.append(f"- Last Updated: {page.get('last_updated', '')}")
-            body_lines.append(f"- Version Hash: {page.get('version_hash', '')}")
-            body_lines.append("")
-            body_lines.append(page.get("body", "").strip())
-            body_lines.append("")
+            body_buf.write(f"\n- Last Updated: {page.get('last_updated', '')}")
+            body_buf.write(f"\n- Version Hash: {page.get('version_hash', '')}")
+            body_buf.write("\n")
+            body_buf.write("\n" + page.get("body", "").strip())
+            body_buf.write("\n")
 
-        bundle_body = "\n".join(body_lines)
-        fm_obj["version_hash"] = self.sha256_text(bundle_body)
+        # Encode the body once and reuse the bytes for both the hash and the
+        # final write.
+        bundle_bytes = body_buf.getvalue().encode("utf-8")
+        fm_obj["version_hash"] = self.sha256_text(bundle_bytes)
 
         fm_yaml = yaml.safe_dump(
             fm_obj, sort_keys=False, allow_unicode=True, width=4096
         ).strip()
 
-        content = f"---\n{fm_yaml}\n---\n\n{bundle_body}"
-        out_path.write_text(content, encoding="utf-8")
+        out_path.write_bytes(
+            ("---\n" + fm_yaml + "\n---\n\n").encode("utf-8") + bundle_bytes
+        )
 
     def build_category_bundles(
         self, pages: list[dict], ai_root: Path, build_timestamp: str = ""
@@ -1114,9 +1307,22 @@ class ResolveMDPlugin(BasePlugin):
         categories_dir = ai_root / "categories"
         self.reset_directory(categories_dir)
 
+        # Inverted index built in one pass: lower-cased category -> pages.
+        # Avoids re-scanning the full page list for every category below.
+        pages_by_category: dict[str, list[dict]] = {}
+        for page in pages:
+            # Dedup after case-folding so a page whose front matter repeats a
+            # category (e.g. "DeFi" and "defi") lands in each bucket once.
+            for cat in {str(cat).lower() for cat in page.get("categories") or []}:
+                pages_by_category.setdefault(cat, []).append(page)
+
+        # Case-folded sort keys computed once per page; the same page object
+        # is sorted into many bundles, so don't re-lowercase its title each time.
+        title_key = {id(p): (p.get("title") or "").lower() for p in pages}
+
         base_sets = []
         for cat_id in base_cats:
-            base_sets.append(self.select_pages_for_category(cat_id, pages))
+            base_sets.append(pages_by_category.get(cat_id.lower(), []))
         base_union = self.union_pages(base_sets) if base_sets else []
 
         log.debug(
@@ -1130,11 +1336,11 @@ class ResolveMDPlugin(BasePlugin):
 
             display_name = cat_info.get("name", category_id)
 
-            category_pages = self.select_pages_for_category(category_id, pages)
+            category_pages = pages_by_category.get(category_id.lower(), [])
 
             if is_base:
                 bundle_pages = sorted(
-                    category_pages, key=lambda p: p.get("title", "").lower()
+                    category_pages, key=lambda p: title_key[id(p)]
                 )
                 log.debug(
                     f"[resolve_md] base bundle {display_name} ({category_id}): {len(bundle_pages)} pages"
@@ -1150,7 +1356,7 @@ class ResolveMDPlugin(BasePlugin):
             else:
                 combined = self.union_pages([base_union, category_pages])
                 bundle_pages = sorted(
-                    combined, key=lambda p: p.get("title", "").lower()
+                    combined, key=lambda p: title_key[id(p)]
                 )
                 log.debug(
                     f"[resolve_md] category bundle {display_name} ({category_id}): base={len(base_union)} cat-only={len(category_pages)} total={len(bundle_pages)}"
@@ -1183,46 +1389,80 @@ class ResolveMDPlugin(BasePlugin):
 
         index_path = ai_root / site_index_name
         llms_path = ai_root / llms_full_name
-        index_path.parent.mkdir(parents=True, exist_ok=True)
-        llms_path.parent.mkdir(parents=True, exist_ok=True)
+        # Both outputs live directly under ai_root; one mkdir covers them.
+        ai_root.mkdir(parents=True, exist_ok=True)
 
         site_index_entries: list[dict] = []
-        jsonl_lines: list[str] = []
-
-        for page in pages:
+        section_count = 0
+
+        # The section line has a fixed shape, so assemble the JSON by hand
+        # with the C string-escape fast path instead of building a dict per
+        # section and dispatching through the generic encoder. The template
+        # keeps json.dumps's default separators so the emitted lines stay
+        # byte-identical to the original encoder output.
+        esc = json.encoder.encode_basestring
+
+        def _json_str(value) -> str:
+            if isinstance(value, str):
+                return esc(value)
+            if value is None:
+                return "null"
+            return json.dumps(value, ensure_ascii=False)
+
+        token_estimator_json = _json_str(token_estimator)
+
+        def _index_one(page: dict) -> tuple[dict, list[bytes]]:
+            """Scan and encode a single page; pure apart from the scan cache."""
             body = page.get("body", "")
-            outline, sections = self.extract_outline_and_sections(
-                body, max_depth=max_depth
-            )
-            preview = page.get("description", "") or self.extract_preview(
-                body, max_chars=preview_chars
-            )
             page_version_hash = page.get("version_hash", self.sha256_text(body))
+            # The scan is a pure function of (body, depth, preview length), so
+            # reuse the result across incremental rebuilds (mkdocs serve) when
+            # the page content hash is unchanged. Keyed by slug and overwritten
+            # on change so stale versions of edited pages don't accumulate.
+            scan_key = (page_version_hash, max_depth, preview_chars)
+            cached = self._scan_cache.get(page["slug"])
+            if cached is None or cached[0] != scan_key:
+                cached = (
+                    scan_key,
+                    self._scan_body(
+                        body, max_depth=max_depth, preview_chars=preview_chars
+                    ),
+                )
+                self._scan_cache[page["slug"]] = cached
+            outline, sections, body_preview = cached[1]
+            preview = page.get("description", "") or body_preview
             page_last_updated = page.get("last_updated", "")
+            # Hoist the per-page fields shared by every section line out
+            # of the inner loop.
+            page_slug = page["slug"]
+            page_title = page.get("title")
+            page_id_json = _json_str(page_slug)
+            page_title_json = _json_str(page_title)
+            version_hash_json = _json_str(page_version_hash)
+            last_updated_json = _json_str(page_last_updated)
 
             total_section_tokens = 0
+            encoded_lines: list[bytes] = []
             for sec in sections:
-                sec_tokens = self.estimate_tokens(sec["text"])
+                sec_tokens = sec["token_count"]
                 total_section_tokens += sec_tokens
-                jsonl_lines.append(
-                    json.dumps(
-                        {
-                            "page_id": page["slug"],
-                            "page_title": page.get("title"),
-                            "index": sec["index"],
-                            "depth": sec["depth"],
-                            "title": sec["title"],
-                            "anchor": sec["anchor"],
-                            "start_char": sec["start_char"],
-                            "end_char": sec["end_char"],
-                            "estimated_token_count": sec_tokens,
-                            "token_estimator": token_estimator,
-                            "page_version_hash": page_version_hash,
-                            "last_updated": page_last_updated,
-                            "text": sec["text"],
-                        },
-                        ensure_ascii=False,
-                    )
+                encoded_lines.append(
+                    (
+                        '{"page_id": ' + page_id_json
+                        + ', "page_title": ' + page_title_json
+                        + ', "index": ' + str(sec["index"])
+                        + ', "depth": ' + str(sec["depth"])
+                        + ', "title": ' + _json_str(sec["title"])
+                        + ', "anchor": ' + _json_str(sec["anchor"])
+                        + ', "start_char": ' + str(sec["start_char"])
+                        + ', "end_char": ' + str(sec["end_char"])
+                        + ', "estimated_token_count": ' + str(sec_tokens)
+                        + ', "token_estimator": ' + token_estimator_json
+                        + ', "page_version_hash": ' + version_hash_json
+                        + ', "last_updated": ' + last_updated_json
+                        + ', "text": ' + _json_str(sec["text"])
+                        + "}\n"
+                    ).encode("utf-8")
                 )
 
             stats = {
@@ -1233,11 +1473,12 @@ class ResolveMDPlugin(BasePlugin):
             }
 
             entry = {
-                "id": page["slug"],
-                "title": page.get("title"),
-                "slug": page["slug"],
+                "id": page_slug,
+                "title": page_title,
+                "slug": page_slug,
                 "categories": page.get("categories", []),
-                "raw_md_url": page.get("url", "").rstrip("/") + ".md",
+                "raw_md_url": page.get("md_url")
+                or page.get("url", "").rstrip("/") + ".md",
                 "html_url": page.get("url"),
                 "preview": preview,
                 "outline": outline,
@@ -1246,7 +1487,18 @@ class ResolveMDPlugin(BasePlugin):
                 "last_updated": page_last_updated,
                 "token_estimator": token_estimator,
             }
-            site_index_entries.append(entry)
+            return entry, encoded_lines
+
+        # Scan/hash/encode pages in parallel — hashing and regex scanning
+        # release the GIL — while the main thread streams results to disk in
+        # page order through a large buffer.
+        with llms_path.open("wb", buffering=1 << 20) as jsonl_fh:
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                for entry, encoded_lines in executor.map(_index_one, pages):
+                    for encoded in encoded_lines:
+                        jsonl_fh.write(encoded)
+                    section_count += len(encoded_lines)
+                    site_index_entries.append(entry)
 
         # Wrap entries in a top-level object with build metadata
         index_content = json.dumps(site_index_entries, ensure_ascii=False, indent=2)
@@ -1258,19 +1510,19 @@ class ResolveMDPlugin(BasePlugin):
         if build_timestamp:
             site_index_obj["build_timestamp"] = build_timestamp
 
-        index_path.write_text(
-            json.dumps(site_index_obj, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
-
-        with llms_path.open("w", encoding="utf-8") as fh:
-            for line in jsonl_lines:
-                fh.write(line + "\n")
+        if orjson is not None:
+            index_bytes = orjson.dumps(site_index_obj, option=orjson.OPT_INDENT_2)
+        else:
+            index_bytes = json.dumps(
+                site_index_obj, ensure_ascii=False, indent=2
+            ).encode("utf-8")
+        index_path.write_bytes(index_bytes)
 
         log.info(
             f"[resolve_md] site index written to {index_path} (pages={len(site_index_entries)})"
         )
         log.info(
-            f"[resolve_md] llms full JSONL written to {llms_path} (sections={len(jsonl_lines)})"
+            f"[resolve_md] llms full JSONL written to {llms_path} (sections={section_count})"
         )
 
     def build_llms_txt(
@@ -1304,10 +1556,16 @@ class ResolveMDPlugin(BasePlugin):
             ) from exc
         out_path.parent.mkdir(parents=True, exist_ok=True)
 
+        # Categories are interned at ingestion, so building the distinct set
+        # here is cheap pointer hashing; share it with the metadata section
+        # instead of recomputing inside.
+        distinct_categories = frozenset(
+            cat for page in pages for cat in (page.get("categories") or [])
+        )
         metadata_section = self.format_llms_metadata_section(
-            pages, build_timestamp
+            pages, build_timestamp, distinct_categories
         )
-        docs_section = self.format_llms_docs_section(
+        docs_lines = self._iter_llms_docs_lines(
             pages, list(categories_info.keys()), categories_info
         )
         summary_line = summary_line.strip()
@@ -1322,22 +1580,27 @@ class ResolveMDPlugin(BasePlugin):
             ),
             "",
             metadata_section,
-            docs_section,
         ]
 
-        llms_txt_content = "\n".join(
-            line for line in content_lines if line is not None
-        )
-        out_path.write_text(llms_txt_content, encoding="utf-8")
+        # Write the fixed head in one join, then stream the docs lines so the
+        # full docs section never exists as one string in memory.
+        with out_path.open("w", encoding="utf-8") as fh:
+            fh.write("\n".join(content_lines))
+            for line in docs_lines:
+                fh.write("\n")
+                fh.write(line)
         log.info(f"[resolve_md] llms.txt written to {out_path}")
 
     @staticmethod
     def format_llms_metadata_section(
-        pages: list[dict], build_timestamp: str = ""
+        pages: list[dict],
+        build_timestamp: str = "",
+        distinct_categories: frozenset[str] | None = None,
     ) -> str:
-        distinct_categories = {
-            cat for page in pages for cat in (page.get("categories") or [])
-        }
+        if distinct_categories is None:
+            distinct_categories = frozenset(
+                cat for page in pages for cat in (page.get("categories") or [])
+            )
         all_content = "".join(p.get("body", "") for p in pages)
         version_hash = ResolveMDPlugin.sha256_text(all_content)
         lines = [
@@ -1357,37 +1620,46 @@ class ResolveMDPlugin(BasePlugin):
         category_order: list[str],
         categories_info: dict | None = None,
     ) -> str:
+        return "\n".join(
+            ResolveMDPlugin._iter_llms_docs_lines(pages, category_order, categories_info)
+        )
+
+    @staticmethod
+    def _iter_llms_docs_lines(
+        pages: list[dict],
+        category_order: list[str],
+        categories_info: dict | None = None,
+    ):
+        """Yield the docs-section lines without materializing them all."""
         categories_info = categories_info or {}
-        grouped: dict[str, list[str]] = {}
+        grouped: dict[str, list[str]] = defaultdict(list)
         for page in pages:
-            resolved_url = page.get("url", "").rstrip("/") + ".md"
+            resolved_url = page.get("md_url") or page.get("url", "").rstrip("/") + ".md"
             title = page.get("title") or page["slug"]
             description = page.get("description") or ""
             cats = page.get("categories") or ["Uncategorized"]
-            line = f"- [{title}]({resolved_url}): {description}"
+            # Plain concatenation: this runs once per page per category and
+            # skips the f-string format machinery. str() keeps non-string
+            # front matter (e.g. a numeric title) working like the f-string
+            # coercion did.
+            line = "- [" + str(title) + "](" + resolved_url + "): " + str(description)
             for cat in cats:
-                grouped.setdefault(cat, []).append(line)
+                grouped[cat].append(line)
 
-        lines = [
-            "## Docs",
-            "This section lists documentation pages by category. Each entry links to the resolved markdown version of the page and includes a short description.",
-        ]
-        seen = set()
+        yield "## Docs"
+        yield "This section lists documentation pages by category. Each entry links to the resolved markdown version of the page and includes a short description."
+        order_set = {cat for cat in category_order if grouped.get(cat)}
         for cat_id in category_order:
+            if cat_id not in order_set:
+                continue
             cat_info = categories_info.get(cat_id, {})
             display_name = cat_info.get("name", cat_id)
+            yield f"\nDocs: {display_name}"
+            yield from grouped[cat_id]
 
-            entries = grouped.get(cat_id)
-            if not entries:
-                continue
-            lines.append(f"\nDocs: {display_name}")
-            lines.extend(entries)
-            seen.add(cat_id)
-
-        remaining = sorted(cat for cat in grouped if cat not in seen)
+        # C-level set difference instead of a per-key membership scan.
+        remaining = sorted(grouped.keys() - order_set)
         for cat in remaining:
-            lines.append(f"\nDocs: {cat}")
-            lines.extend(grouped[cat])
-
-        return "\n".join(lines)
+            yield f"\nDocs: {cat}"
+            yield from grouped[cat]
 
@@ -0,0 +1,14 @@
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_imports():
+    """Import the heavy MkDocs build modules once per test session.
+
+    With pytest-xdist each worker pays these imports during warmup instead of
+    inside the first integration test that touches them.
+    """
+    import subprocess  # noqa: F401
+
+    import mkdocs.commands.build  # noqa: F401
+    import mkdocs.config  # noqa: F401